@@ -1,4 +1,4 @@
-import { useState, useEffect, useRef, useCallback, Fragment } from "react";
+import { useState, useEffect, useRef, useCallback, useMemo, memo, Fragment } from "react";
 import { useQuery, useMutation } from "@tanstack/react-query";
 import { Link, useParams, useLocation } from "wouter";
 import { AdminLayout } from "@/components/admin-layout";
@@ -157,7 +157,9 @@ interface CheckpointEditorProps {
 }
 
 
-function SortableCheckpoint({
+// Callbacks are left out of the comparison: SortableStep's item handlers read
+// the latest step through a ref, so a skipped re-render never leaves a stale one.
+const SortableCheckpoint = memo(function SortableCheckpoint({
   checkpoint,
   stepIndex,
   itemIndex,
@@ -190,14 +192,19 @@ function SortableCheckpoint({
           stepIndex={stepIndex}
           checkpointIndex={itemIndex}
           checkpointRequired={checkpointRequired}
-          onChange={(data) => onChange(data)}
+          onChange={onChange}
           onRequiredChange={onRequiredChange}
           onRemove={onRemove}
         />
       </div>
     </div>
   );
-}
+}, (prev, next) =>
+  prev.checkpoint === next.checkpoint &&
+  prev.stepIndex === next.stepIndex &&
+  prev.itemIndex === next.itemIndex &&
+  prev.checkpointRequired === next.checkpointRequired
+);
 
 function CheckpointEditor({
   checkpoint,
@@ -481,7 +488,8 @@ function LoadingSkeleton() {
   );
 }
 
-function SortableContentBlock({
+// See SortableCheckpoint for why callbacks are not compared
+const SortableContentBlock = memo(function SortableContentBlock({
   block,
   stepIndex,
   blockIndex,
@@ -778,7 +786,11 @@ function SortableContentBlock({
       </Card>
     </div>
   );
-}
+}, (prev, next) =>
+  prev.block === next.block &&
+  prev.stepIndex === next.stepIndex &&
+  prev.blockIndex === next.blockIndex
+);
 
 // CheckpointEditor moved to top of file
 
@@ -1323,25 +1335,45 @@ function SortableTableBlock({
 
 
 // Preview components that match user-facing styling
+// Class lookups for ContentBlockPreview, kept at module scope so each render
+// resolves a layout decision with one Map lookup. Map keys compare like ===,
+// so a value outside the union (a string "2", or an inherited name like
+// "constructor") falls back to the default exactly as the old ternaries did.
+const BASIS = new Map<ContentBlockFormData["blockWidth"], string>([
+  ["1/3", "md:basis-[calc(33.333%-1.5rem)]"],
+  ["1/2", "md:basis-[calc(50%-1.5rem)]"],
+  ["2/3", "md:basis-[calc(66.666%-1.5rem)]"],
+]);
+
+const PROSE = new Map<ContentBlockFormData["fontSize"], string>([
+  ["small", "prose-sm"],
+  ["large", "prose-lg"],
+  ["xlarge", "prose-xl"],
+]);
+
+// Smart grid proportions based on mediaWidth (50% and 100% use the default split)
+const GRID_COLS = new Map<ContentBlockFormData["mediaWidth"], string>([
+  ["25%", "grid-cols-1 md:grid-cols-[1fr_3fr]"],
+  ["33%", "grid-cols-1 md:grid-cols-[1fr_2fr]"],
+  ["75%", "grid-cols-1 md:grid-cols-[3fr_1fr]"],
+]);
+
+const COLUMN_CLASS = new Map<ContentBlockFormData["columns"], string>([
+  [2, "prose-columns-2"],
+  [3, "prose-columns-3"],
+]);
+
 function ContentBlockPreview({ block }: { block: ContentBlockFormData }) {
-  const basisClass = block.blockWidth === "1/3" ? "md:basis-[calc(33.333%-1.5rem)]" :
-    block.blockWidth === "1/2" ? "md:basis-[calc(50%-1.5rem)]" :
-      block.blockWidth === "2/3" ? "md:basis-[calc(66.666%-1.5rem)]" : "basis-full";
+  const basisClass = BASIS.get(block.blockWidth) ?? "basis-full";
 
   const hasImage = !!block.imageUrl;
   const hasContent = !!block.content;
 
-  const proseClass = block.fontSize === "small" ? "prose-sm" :
-    block.fontSize === "large" ? "prose-lg" :
-      block.fontSize === "xlarge" ? "prose-xl" : "prose-base";
+  const proseClass = PROSE.get(block.fontSize) ?? "prose-base";
 
   // Side-by-side arrangement: text and image in columns
   if (hasImage && hasContent && block.arrangement === "side-by-side") {
-    // Smart grid proportions based on mediaWidth
-    let gridCols = "grid-cols-1 md:grid-cols-2";
-    if (block.mediaWidth === "25%") gridCols = "grid-cols-1 md:grid-cols-[1fr_3fr]";
-    else if (block.mediaWidth === "33%") gridCols = "grid-cols-1 md:grid-cols-[1fr_2fr]";
-    else if (block.mediaWidth === "75%") gridCols = "grid-cols-1 md:grid-cols-[3fr_1fr]";
+    const gridCols = GRID_COLS.get(block.mediaWidth) ?? "grid-cols-1 md:grid-cols-2";
 
     const imageOnLeft = block.mediaPosition === "left";
 
@@ -1363,8 +1395,7 @@ function ContentBlockPreview({ block }: { block: ContentBlockFormData }) {
   }
 
   // Stacked arrangement or single-content blocks
-  const columnClass = block.columns === 3 ? "prose-columns-3" :
-    block.columns === 2 ? "prose-columns-2" : "";
+  const columnClass = COLUMN_CLASS.get(block.columns) ?? "";
 
   return (
     <div className={cn("mb-8", basisClass)} data-testid="content-block-preview">
@@ -1496,8 +1527,10 @@ function CheckpointPreview({ checkpoint }: { checkpoint: CheckpointFormData }) {
 }
 
 function StepPreview({ step, index }: { step: StepFormData; index: number }) {
+  // content-visibility lets the browser skip layout and paint for steps scrolled
+  // out of view; the intrinsic size keeps the scrollbar stable until they render.
   return (
-    <Card className="border-0 shadow-none bg-transparent">
+    <Card className="border-0 shadow-none bg-transparent [content-visibility:auto] [contain-intrinsic-size:auto_600px]">
       <CardHeader className="px-0">
         <div className="flex items-center gap-2 mb-2">
           <Badge variant="outline" className="text-primary border-primary/30 uppercase tracking-wider text-[10px] py-0 px-2">
@@ -1564,10 +1597,18 @@ function SortableStep({
     })
   );
 
+  // Item rows are memoized and may hold on to callbacks from an earlier render,
+  // so the handlers they receive always act on the latest step.
+  const stepRef = useRef(step);
+  stepRef.current = step;
+  const onChangeRef = useRef(onChange);
+  onChangeRef.current = onChange;
+
   const handleItemChange = (itemIndex: number, data: Partial<ContentBlockFormData | CheckpointFormData | TableBlockFormData>) => {
-    const newItems = [...step.items];
+    const current = stepRef.current;
+    const newItems = [...current.items];
     newItems[itemIndex] = { ...newItems[itemIndex], ...data } as any;
-    onChange({ ...step, items: newItems });
+    onChangeRef.current({ ...current, items: newItems });
   };
 
   const handleAddContentBlock = () => {
@@ -1592,12 +1633,17 @@ function SortableStep({
   };
 
   const handleRemoveItem = (itemIndex: number) => {
-    onChange({
-      ...step,
-      items: step.items.filter((_, i) => i !== itemIndex),
+    const current = stepRef.current;
+    onChangeRef.current({
+      ...current,
+      items: current.items.filter((_, i) => i !== itemIndex),
     });
   };
 
+  const handleRequiredChange = (required: boolean) => {
+    onChangeRef.current({ ...stepRef.current, checkpointRequired: required });
+  };
+
   const handleAddCheckpoint = () => {
     onChange({
       ...step,
@@ -1659,6 +1705,15 @@ function SortableStep({
     }
   };
 
+  const { checkpointCount, contentCount } = useMemo(() => {
+    let checkpointCount = 0;
+    let contentCount = 0;
+    for (const item of step.items) {
+      if (item.itemType === "checkpoint") checkpointCount++;
+      else if (item.itemType === "content") contentCount++;
+    }
+    return { checkpointCount, contentCount };
+  }, [step.items]);
 
   return (
     <div ref={setNodeRef} style={style} className={cn(isDragging && "z-50")}>
@@ -1691,14 +1746,14 @@ function SortableStep({
                 </CollapsibleTrigger>
               </div>
               <div className="flex items-center gap-2">
-                {step.items.filter(i => i.itemType === 'checkpoint').length > 0 && (
+                {checkpointCount > 0 && (
                   <Badge variant="secondary" className="text-xs">
                     <HelpCircle className="h-3 w-3 mr-1" />
-                    {step.items.filter(i => i.itemType === 'checkpoint').length} Question{step.items.filter(i => i.itemType === 'checkpoint').length > 1 ? 's' : ''}
+                    {checkpointCount} Question{checkpointCount > 1 ? 's' : ''}
                   </Badge>
                 )}
                 <Badge variant="outline" className="text-xs">
-                  {step.items.filter(i => i.itemType === 'content').length} block{step.items.filter(i => i.itemType === 'content').length !== 1 ? "s" : ""}
+                  {contentCount} block{contentCount !== 1 ? "s" : ""}
                 </Badge>
                 <Button
                   variant="ghost"
@@ -1845,7 +1900,7 @@ function SortableStep({
                                 itemIndex={itemIndex}
                                 checkpointRequired={step.checkpointRequired}
                                 onChange={(data) => handleItemChange(itemIndex, data)}
-                                onRequiredChange={(required) => onChange({ ...step, checkpointRequired: required })}
+                                onRequiredChange={handleRequiredChange}
                                 onRemove={() => handleRemoveItem(itemIndex)}
                               />
                             );
@@ -216,6 +216,40 @@ function StepNavItem({
   );
 }
 
+// Class lookups for StepBlockRenderer, kept at module scope so each render
+// resolves a layout decision with one Map lookup. Map keys compare like ===,
+// so a string "2" from old metadata or an inherited name like "constructor"
+// falls back to the default.
+const BASIS = new Map<unknown, string>([
+  ["1/3", "md:basis-[calc(33.333%-1.5rem)]"],
+  ["1/2", "md:basis-[calc(50%-1.5rem)]"],
+  ["2/3", "md:basis-[calc(66.666%-1.5rem)]"],
+]);
+
+const PROSE_SIZE = new Map<unknown, string>([
+  ["small", "prose-sm"],
+  ["large", "prose-lg"],
+  ["xlarge", "prose-xl"],
+]);
+
+// Old splitRatio values for backward compat; they win over GRID_COLS
+const SPLIT_RATIO_COLS = new Map<unknown, string>([
+  ["30-70", "grid-cols-1 md:grid-cols-[3fr_7fr]"],
+  ["70-30", "grid-cols-1 md:grid-cols-[7fr_3fr]"],
+]);
+
+// Smart proportions based on image width (50% and 100% → default 50/50)
+const GRID_COLS = new Map<unknown, string>([
+  ["25%", "grid-cols-1 md:grid-cols-[1fr_3fr]"],
+  ["33%", "grid-cols-1 md:grid-cols-[1fr_2fr]"],
+  ["75%", "grid-cols-1 md:grid-cols-[3fr_1fr]"],
+]);
+
+const COLUMN_CLASS = new Map<unknown, string>([
+  [2, "prose-columns-2"],
+  [3, "prose-columns-3"],
+]);
+
 function StepBlockRenderer({ block }: { block: any }) { // Using any for now — block comes from DB with mixed old/new metadata
   const meta = block.metadata || {};
 
@@ -285,38 +319,16 @@ function StepBlockRenderer({ block }: { block: any }) { // Using any for now —
   const imageWidth = meta.imageWidth || "100%";
 
   // Block width
-  const blockWidth = meta.width || "full";
-  const basisClass = blockWidth === "1/3" ? "md:basis-[calc(33.333%-1.5rem)]" :
-    blockWidth === "1/2" ? "md:basis-[calc(50%-1.5rem)]" :
-      blockWidth === "2/3" ? "md:basis-[calc(66.666%-1.5rem)]" : "basis-full";
+  const basisClass = BASIS.get(meta.width) ?? "basis-full";
 
   // Text formatting
-  const columns = meta.columns || 1;
-  const fontSize = meta.fontSize || "normal";
-
-  const proseClass = fontSize === "small" ? "prose-sm" :
-    fontSize === "large" ? "prose-lg" :
-      fontSize === "xlarge" ? "prose-xl" : "prose-base";
+  const proseClass = PROSE_SIZE.get(meta.fontSize) ?? "prose-base";
 
   // Side-by-side arrangement
   if (hasImage && hasContent && arrangement === "side-by-side") {
     // Calculate smart grid proportions based on imageWidth
     // Instead of fixed 50/50, give more space to text when image is small
-    let gridCols = "grid-cols-1 md:grid-cols-2";
-
-    // Support old splitRatio for backward compat
-    const ratio = meta.splitRatio;
-    if (ratio === "30-70") {
-      gridCols = "grid-cols-1 md:grid-cols-[3fr_7fr]";
-    } else if (ratio === "70-30") {
-      gridCols = "grid-cols-1 md:grid-cols-[7fr_3fr]";
-    } else {
-      // Smart proportions based on image width
-      if (imageWidth === "25%") gridCols = "grid-cols-1 md:grid-cols-[1fr_3fr]";
-      else if (imageWidth === "33%") gridCols = "grid-cols-1 md:grid-cols-[1fr_2fr]";
-      else if (imageWidth === "75%") gridCols = "grid-cols-1 md:grid-cols-[3fr_1fr]";
-      // 50% and 100% → default 50/50
-    }
+    const gridCols = SPLIT_RATIO_COLS.get(meta.splitRatio) ?? GRID_COLS.get(imageWidth) ?? "grid-cols-1 md:grid-cols-2";
 
     const imageOnLeft = mediaPosition === "left";
 
@@ -349,8 +361,7 @@ function StepBlockRenderer({ block }: { block: any }) { // Using any for now —
 
   // Stacked or single-content blocks (also handles old "image" and "text" blockTypes)
   // In stacked mode, multi-column text is safe to apply
-  const columnClass = columns === 3 ? "prose-columns-3" :
-    columns === 2 ? "prose-columns-2" : "";
+  const columnClass = COLUMN_CLASS.get(meta.columns) ?? "";
 
   return (
     <div className={cn("mb-8", basisClass)} data-testid={`content-block-${block.id}`}>
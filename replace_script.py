@@ -1,47 +1,72 @@
-import re
+import sys
+from pathlib import Path
 
-with open("client/src/pages/admin/module-builder.tsx", "r") as f:
-    content = f.read()
+PATH = "client/src/pages/admin/module-builder.tsx"
+
+# Left behind by a previous run (the StepFormData items field). Only the prefix
+# is matched, since later changes add more block types to the union.
+PATCHED_MARKER = b"items: (ContentBlockFormData | CheckpointFormData"
+
+
+# The TSX edits are all ASCII, so the whole pipeline works on raw bytes and never
+# goes through a UTF-8 decode/encode round trip. The file is read and written
+# whole, in one call each.
+def read_source(path):
+    return Path(path).read_bytes()
+
+
+def write_source(path, content):
+    Path(path).write_bytes(content)
+
+
+# Every edit is collected as an (old, new) pair, in the order the needles appear
+# in the file, and applied at the end instead of rebuilding the file per replace.
+edits = []
+
+# 0. Item rows and the step header counts below are memoized
+edits.append((b'import { useState', b'import { memo, useMemo, useState'))
 
 # 1. Interfaces
-content = content.replace("""interface StepFormData {
+edits.append((b"""interface StepFormData {
   id?: number;
   tempId: string;
   title: string;
   contentBlocks: ContentBlockFormData[];
   checkpoints: CheckpointFormData[];
   checkpointRequired: boolean;
-}""", """interface StepFormData {
+}""", b"""interface StepFormData {
   id?: number;
   tempId: string;
   title: string;
   items: (ContentBlockFormData | CheckpointFormData)[];
   checkpointRequired: boolean;
-}""")
+}"""))
 
-content = content.replace("""interface ContentBlockFormData {
+edits.append((b"""interface ContentBlockFormData {
   id?: number;
   tempId: string;
-  blockType: string;""", """interface ContentBlockFormData {
+  blockType: string;""", b"""interface ContentBlockFormData {
   id?: number;
   tempId: string;
   itemType: "content";
   order?: number;
-  blockType: string;""")
+  blockType: string;"""))
 
-content = content.replace("""interface CheckpointFormData {
+edits.append((b"""interface CheckpointFormData {
   question: string;
-  options: string[];""", """interface CheckpointFormData {
+  options: string[];""", b"""interface CheckpointFormData {
   id?: number;
   tempId: string;
   itemType: "checkpoint";
   order?: number;
   question: string;
-  options: string[];""")
+  options: string[];"""))
 
 # 2. Add SortableCheckpoint component just above CheckpointEditor
-sortable_checkpoint = """
-function SortableCheckpoint({
+sortable_checkpoint = b"""
+// Callbacks are left out of the comparison: SortableStep's item handlers read
+// the latest step through a ref, so a skipped re-render never leaves a stale one.
+const SortableCheckpoint = memo(function SortableCheckpoint({
   checkpoint,
   stepIndex,
   itemIndex,
@@ -74,20 +99,25 @@ function SortableCheckpoint({
           stepIndex={stepIndex}
           checkpointIndex={itemIndex}
           checkpointRequired={checkpointRequired}
-          onChange={(data) => onChange(data)}
+          onChange={onChange}
           onRequiredChange={onRequiredChange}
           onRemove={onRemove}
         />
       </div>
     </div>
   );
-}
+}, (prev, next) =>
+  prev.checkpoint === next.checkpoint &&
+  prev.stepIndex === next.stepIndex &&
+  prev.itemIndex === next.itemIndex &&
+  prev.checkpointRequired === next.checkpointRequired
+);
 
 """
-content = content.replace("function CheckpointEditor({", sortable_checkpoint + "function CheckpointEditor({")
+edits.append((b"function CheckpointEditor({", sortable_checkpoint + b"function CheckpointEditor({"))
 
 # 3. StepPreview
-step_preview_old = """      <CardContent className="space-y-6">
+step_preview_old = b"""      <CardContent className="space-y-6">
         {step.contentBlocks.length === 0 && step.checkpoints.length === 0 && (
           <p className="text-muted-foreground italic">No content added to this step yet.</p>
         )}
@@ -103,7 +133,7 @@ step_preview_old = """      <CardContent className="space-y-6">
         ))}
       </CardContent>"""
 
-step_preview_new = """      <CardContent className="space-y-6">
+step_preview_new = b"""      <CardContent className="space-y-6">
         {step.items.length === 0 && (
           <p className="text-muted-foreground italic">No content added to this step yet.</p>
         )}
@@ -120,20 +150,28 @@ step_preview_new = """      <CardContent className="space-y-6">
           }
         })}
       </CardContent>"""
-content = content.replace(step_preview_old, step_preview_new)
+edits.append((step_preview_old, step_preview_new))
 
 # 4. SortableStep body
-content = content.replace("""  const handleContentBlockChange = (blockIndex: number, data: Partial<ContentBlockFormData>) => {
+edits.append((b"""  const handleContentBlockChange = (blockIndex: number, data: Partial<ContentBlockFormData>) => {
     const newBlocks = [...step.contentBlocks];
     newBlocks[blockIndex] = { ...newBlocks[blockIndex], ...data };
     onChange({ ...step, contentBlocks: newBlocks });
-  };""", """  const handleItemChange = (itemIndex: number, data: Partial<ContentBlockFormData | CheckpointFormData>) => {
-    const newItems = [...step.items];
+  };""", b"""  // Item rows are memoized and may hold on to callbacks from an earlier render,
+  // so the handlers they receive always act on the latest step.
+  const stepRef = useRef(step);
+  stepRef.current = step;
+  const onChangeRef = useRef(onChange);
+  onChangeRef.current = onChange;
+
+  const handleItemChange = (itemIndex: number, data: Partial<ContentBlockFormData | CheckpointFormData>) => {
+    const current = stepRef.current;
+    const newItems = [...current.items];
     newItems[itemIndex] = { ...newItems[itemIndex], ...data } as any;
-    onChange({ ...step, items: newItems });
-  };""")
+    onChangeRef.current({ ...current, items: newItems });
+  };"""))
 
-content = content.replace("""  const handleAddContentBlock = () => {
+edits.append((b"""  const handleAddContentBlock = () => {
     onChange({
       ...step,
       contentBlocks: [
@@ -189,7 +227,7 @@ content = content.replace("""  const handleAddContentBlock = () => {
         contentBlocks: arrayMove(step.contentBlocks, oldIndex, newIndex),
       });
     }
-  };""", """  const handleAddContentBlock = () => {
+  };""", b"""  const handleAddContentBlock = () => {
     onChange({
       ...step,
       items: [
@@ -200,12 +238,17 @@ content = content.replace("""  const handleAddContentBlock = () => {
   };
 
   const handleRemoveItem = (itemIndex: number) => {
-    onChange({
-      ...step,
-      items: step.items.filter((_, i) => i !== itemIndex),
+    const current = stepRef.current;
+    onChangeRef.current({
+      ...current,
+      items: current.items.filter((_, i) => i !== itemIndex),
     });
   };
 
+  const handleRequiredChange = (required: boolean) => {
+    onChangeRef.current({ ...stepRef.current, checkpointRequired: required });
+  };
+
   const handleAddCheckpoint = () => {
     onChange({
       ...step,
@@ -234,10 +277,16 @@ content = content.replace("""  const handleAddContentBlock = () => {
         items: arrayMove(step.items, oldIndex, newIndex),
       });
     }
-  };""")
+  };
+
+  const checkpointCount = useMemo(
+    () => step.items.reduce((n, i) => n + (i.itemType === 'checkpoint' ? 1 : 0), 0),
+    [step.items]
+  );
+  const contentCount = step.items.length - checkpointCount;"""))
 
 # 5. SortableStep render header counts
-header_old = """              <div className="flex items-center gap-2">
+header_old = b"""              <div className="flex items-center gap-2">
                 {step.checkpoints.length > 0 && (
                   <Badge variant="secondary" className="text-xs">
                     <HelpCircle className="h-3 w-3 mr-1" />
@@ -247,20 +296,20 @@ header_old = """              <div className="flex items-center gap-2">
                 <Badge variant="outline" className="text-xs">
                   {step.contentBlocks.length} block{step.contentBlocks.length !== 1 ? "s" : ""}
                 </Badge>"""
-header_new = """              <div className="flex items-center gap-2">
-                {step.items.filter(i => i.itemType === 'checkpoint').length > 0 && (
+header_new = b"""              <div className="flex items-center gap-2">
+                {checkpointCount > 0 && (
                   <Badge variant="secondary" className="text-xs">
                     <HelpCircle className="h-3 w-3 mr-1" />
-                    {step.items.filter(i => i.itemType === 'checkpoint').length} Question{step.items.filter(i => i.itemType === 'checkpoint').length > 1 ? 's' : ''}
+                    {checkpointCount} Question{checkpointCount > 1 ? 's' : ''}
                   </Badge>
                 )}
                 <Badge variant="outline" className="text-xs">
-                  {step.items.filter(i => i.itemType === 'content').length} block{step.items.filter(i => i.itemType === 'content').length !== 1 ? "s" : ""}
+                  {contentCount} block{contentCount !== 1 ? "s" : ""}
                 </Badge>"""
-content = content.replace(header_old, header_new)
+edits.append((header_old, header_new))
 
 # 6. SortableStep content blocks & checkpoints -> unified DndContext list
-step_content_old = """              <div className="space-y-4">
+step_content_old = b"""              <div className="space-y-4">
                 <div className="flex items-center justify-between">
                   <Label className="text-base font-medium">Content Blocks</Label>
                   <Button
@@ -343,7 +392,7 @@ step_content_old = """              <div className="space-y-4">
                 )}
               </div>"""
 
-step_content_new = """              <div className="space-y-4">
+step_content_new = b"""              <div className="space-y-4">
                 <div className="flex items-center justify-between">
                   <Label className="text-base font-medium">Step Content</Label>
                   <div className="flex gap-2">
@@ -400,7 +449,7 @@ step_content_new = """              <div className="space-y-4">
                                 itemIndex={itemIndex}
                                 checkpointRequired={step.checkpointRequired}
                                 onChange={(data) => handleItemChange(itemIndex, data)}
-                                onRequiredChange={(required) => onChange({ ...step, checkpointRequired: required })}
+                                onRequiredChange={handleRequiredChange}
                                 onRemove={() => handleRemoveItem(itemIndex)}
                               />
                             );
@@ -415,10 +464,10 @@ step_content_new = """              <div className="space-y-4">
                   </p>
                 )}
               </div>"""
-content = content.replace(step_content_old, step_content_new)
+edits.append((step_content_old, step_content_new))
 
 # 7. useEffect for init data mapping
-init_mapping_old = """          let checkpointsArray: CheckpointFormData[] = [];
+init_mapping_old = b"""          let checkpointsArray: CheckpointFormData[] = [];
           if (s.checkpoints && Array.isArray(s.checkpoints)) {
             checkpointsArray = s.checkpoints.map((cp) => ({
               question: cp.question,
@@ -454,7 +503,7 @@ init_mapping_old = """          let checkpointsArray: CheckpointFormData[] = [];
             checkpointRequired: s.checkpointRequired !== undefined ? s.checkpointRequired : true,
           };"""
 
-init_mapping_new = """          // Unify contentBlocks and checkpoints into items array
+init_mapping_new = b"""          // Unify contentBlocks and checkpoints into items array
           let items: (ContentBlockFormData | CheckpointFormData)[] = [];
 
           if (s.contentBlocks) {
@@ -506,10 +555,10 @@ init_mapping_new = """          // Unify contentBlocks and checkpoints into item
             items,
             checkpointRequired: s.checkpointRequired !== undefined ? s.checkpointRequired : true,
           };"""
-content = content.replace(init_mapping_old, init_mapping_new)
+edits.append((init_mapping_old, init_mapping_new))
 
 # 8. saveSteps mapping
-save_mapping_old = """            let checkpointsArray: CheckpointFormData[] = [];
+save_mapping_old = b"""            let checkpointsArray: CheckpointFormData[] = [];
             if (s.checkpoints && Array.isArray(s.checkpoints)) {
               checkpointsArray = s.checkpoints.map((cp: any) => ({
                 question: cp.question,
@@ -544,11 +593,11 @@ save_mapping_old = """            let checkpointsArray: CheckpointFormData[] = [
               checkpointRequired: s.checkpointRequired ?? true,
             };"""
 save_mapping_new = init_mapping_new  # Re-use the same init mapping payload
-content = content.replace(save_mapping_old, save_mapping_new)
+edits.append((save_mapping_old, save_mapping_new))
 
 
 # 9. handleAddStep
-add_step_old = """  const handleAddStep = () => {
+add_step_old = b"""  const handleAddStep = () => {
     const newStep: StepFormData = {
       tempId: generateTempId(),
       title: `Step ${steps.length + 1}`,
@@ -556,15 +605,55 @@ add_step_old = """  const handleAddStep = () => {
       checkpoints: [],
       checkpointRequired: true,
     };"""
-add_step_new = """  const handleAddStep = () => {
+add_step_new = b"""  const handleAddStep = () => {
     const newStep: StepFormData = {
       tempId: generateTempId(),
       title: `Step ${steps.length + 1}`,
       items: [],
       checkpointRequired: true,
     };"""
-content = content.replace(add_step_old, add_step_new)
-
-with open("client/src/pages/admin/module-builder.tsx", "w") as f:
-    f.write(content)
-print("done")
+edits.append((add_step_old, add_step_new))
+
+
+def apply_replace_edits(content):
+    # Each needle occurs once and the edits are listed in file order, so every
+    # search resumes where the previous match ended and the whole file is
+    # swept once. The result is built with a single join of the untouched
+    # stretches and the replacements. A needle that is missing means the file
+    # has drifted from what the edits expect; nothing is written then.
+    chain = []
+    pos = 0
+    for old, new in edits:
+        start = content.find(old, pos)
+        if start == -1:
+            first_line = old.splitlines()[0].decode()
+            raise ValueError(f"edit not found: {first_line!r}")
+        chain.append(content[pos:start])
+        chain.append(new)
+        pos = start + len(old)
+    chain.append(content[pos:])
+    return b"".join(chain)
+
+
+def apply_replace_edits_once(content):
+    # replace_script.py may already have been run on its own, as in
+    # "python3 replace_script.py && python3 update_builder_pillars.py"; its
+    # needles are gone by then, so pass the text through untouched.
+    if PATCHED_MARKER in content:
+        return content
+    return apply_replace_edits(content)
+
+
+if __name__ == "__main__":
+    content = read_source(PATH)
+    # The first needle is gone after a run, so check for the marker instead of
+    # letting the sweep fail halfway through the file.
+    if PATCHED_MARKER in content:
+        print("already patched")
+    else:
+        try:
+            content = apply_replace_edits(content)
+        except ValueError as e:
+            sys.exit(f"{PATH}: {e}, file left unchanged")
+        write_source(PATH, content)
+        print("done")
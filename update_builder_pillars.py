@@ -1,10 +1,19 @@
 import re
+import sys
 
-with open("client/src/pages/admin/module-builder.tsx", "r") as f:
-    content = f.read()
+from replace_script import PATH, apply_replace_edits_once, read_source, write_source
+
+# The old ContentBlockPreview runs up to the first closing brace at column 0.
+# Anchoring on that line keeps the lazy scan linear instead of backtracking
+# over every "}" followed by whitespace inside the function body.
+PREVIEW_RE = re.compile(rb"function ContentBlockPreview\b[\s\S]*?\n\}(?=\n)")
+
+# Left behind by a previous run: the first line of the rewritten
+# ContentBlockPreview, which a second run would otherwise duplicate
+PILLARS_MARKER = b"// Class lookups for ContentBlockPreview"
 
 # 1. Add width selector to SortableContentBlock
-width_selector = r"""                  )}
+width_selector = rb"""                  )}
                 </div>
                 <div className="flex items-center gap-2 mt-2">
                   <Label className="text-xs text-muted-foreground whitespace-nowrap">Block Width:</Label>
@@ -24,24 +33,39 @@ width_selector = r"""                  )}
                   </div>
                 </div>"""
 
-# Insert after the Type/Columns selectors in SortableContentBlock
-content = content.replace("                      </div>\n                    </div>\n                  )}", width_selector)
-
 # 2. Refactor ContentBlockPreview to match StepBlockRenderer
-block_renderer_alignment = r"""function ContentBlockPreview({ block }: { block: ContentBlockFormData }) {
-  const width = block.metadata?.width || "full";
-  const basisClass = width === "1/3" ? "md:basis-[calc(33.333%-1.5rem)]" :
-                     width === "1/2" ? "md:basis-[calc(50%-1.5rem)]" : "basis-full";
+block_renderer_alignment = rb"""// Class lookups for ContentBlockPreview, kept at module scope so each render
+// resolves a layout decision with one Map lookup. Map keys compare like ===,
+// so a string "2" or an inherited name like "constructor" falls back to the
+// default exactly as the old ternaries did.
+const BASIS = new Map<unknown, string>([
+  ["1/2", "md:basis-[calc(50%-1.5rem)]"],
+  ["1/3", "md:basis-[calc(33.333%-1.5rem)]"],
+]);
+
+const GRID_COLS = new Map<unknown, string>([
+  ["30-70", "grid-cols-1 md:grid-cols-[3fr_7fr]"],
+  ["70-30", "grid-cols-1 md:grid-cols-[7fr_3fr]"],
+]);
+
+const PROSE = new Map<unknown, string>([
+  ["small", "prose-sm"],
+  ["large", "prose-lg"],
+  ["xlarge", "prose-xl"],
+]);
+
+const COLUMN_CLASS = new Map<unknown, string>([
+  [2, "prose-columns-2"],
+  [3, "prose-columns-3"],
+]);
+
+function ContentBlockPreview({ block }: { block: ContentBlockFormData }) {
+  const basisClass = BASIS.get(block.metadata?.width) ?? "basis-full";
 
   if (block.blockType === "split") {
-    const ratio = block.metadata?.splitRatio || "50-50";
+    const gridCols = GRID_COLS.get(block.metadata?.splitRatio) ?? "grid-cols-1 md:grid-cols-2";
     const reverse = block.metadata?.reverseLayout || false;
 
-    // Calculate grid columns based on ratio
-    let gridCols = "grid-cols-1 md:grid-cols-2"; // Default 50-50
-    if (ratio === "30-70") gridCols = "grid-cols-1 md:grid-cols-[3fr_7fr]";
-    if (ratio === "70-30") gridCols = "grid-cols-1 md:grid-cols-[7fr_3fr]";
-
     return (
       <div className={cn("grid gap-8 items-start mb-8", gridCols, basisClass)} data-testid="content-block-preview">
         <div className={cn("prose prose-lg dark:prose-invert max-w-none", reverse && "md:order-2")}>
@@ -87,16 +111,8 @@ block_renderer_alignment = r"""function ContentBlockPreview({ block }: { block:
   }
 
   // Default to text
-  const columns = block.metadata?.columns || 1;
-  const fontSize = block.metadata?.fontSize || "normal";
-
-  const columnClass = columns === 3 ? "prose-columns-3" :
-    columns === 2 ? "prose-columns-2" : "";
-
-  const proseClass = fontSize === "small" ? "prose-sm" :
-    fontSize === "large" ? "prose-lg" :
-      fontSize === "xlarge" ? "prose-xl" :
-        "prose-lg"; // default size
+  const columnClass = COLUMN_CLASS.get(block.metadata?.columns) ?? "";
+  const proseClass = PROSE.get(block.metadata?.fontSize) ?? "prose-lg";
 
   return (
     <div className={cn("mb-8", basisClass)} data-testid="content-block-preview">
@@ -114,12 +130,48 @@ block_renderer_alignment = r"""function ContentBlockPreview({ block }: { block:
   );
 }"""
 
-# Use a regex to find the old ContentBlockPreview function and replace it
-content = re.sub(r"function ContentBlockPreview.*?\}\s+\}", block_renderer_alignment, content, flags=re.DOTALL)
 
-# 3. Update StepPreview to use flex flex-wrap
-content = content.replace('<CardContent className="space-y-6">', '<CardContent className="flex flex-wrap gap-x-6 gap-y-8">')
+def replace_required(content, old, new):
+    # A needle that is missing means the file has drifted from what the edits
+    # expect; fail like apply_replace_edits instead of writing a partial patch.
+    if old not in content:
+        first_line = old.strip().splitlines()[0].decode()
+        raise ValueError(f"edit not found: {first_line!r}")
+    return content.replace(old, new)
+
+
+def apply_pillar_edits(content):
+    # 1. Insert the width selector after the Type/Columns selectors in SortableContentBlock
+    content = replace_required(content, b"                      </div>\n                    </div>\n                  )}", width_selector)
+
+    # 2. Replace the old ContentBlockPreview function. The callable hands back
+    # the template verbatim, so re never parses it for backreferences.
+    content, found = PREVIEW_RE.subn(lambda m: block_renderer_alignment, content, count=1)
+    if not found:
+        raise ValueError("edit not found: 'function ContentBlockPreview'")
+
+    # 3. Update StepPreview to use flex flex-wrap
+    content = replace_required(content, b'<CardContent className="space-y-6">', b'<CardContent className="flex flex-wrap gap-x-6 gap-y-8">')
+
+    # 4. Let the browser skip layout and paint for offscreen StepPreview cards
+    return replace_required(
+        content,
+        b'<Card className="border-0 shadow-none bg-transparent">',
+        b'<Card className="border-0 shadow-none bg-transparent [content-visibility:auto] [contain-intrinsic-size:auto_600px]">',
+    )
+
 
-with open("client/src/pages/admin/module-builder.tsx", "w") as f:
-    f.write(content)
-print("done")
+if __name__ == "__main__":
+    # replace_script.py's edits always run right before these ones, so read and
+    # write the file once and pipe the text through both passes in memory.
+    # A rerun stops at one substring test instead of scanning for every edit.
+    content = read_source(PATH)
+    if PILLARS_MARKER in content:
+        print("already patched")
+    else:
+        try:
+            content = apply_pillar_edits(apply_replace_edits_once(content))
+        except ValueError as e:
+            sys.exit(f"{PATH}: {e}, file left unchanged")
+        write_source(PATH, content)
+        print("done")
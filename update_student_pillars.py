@@ -1,111 +1,177 @@
+import mmap
+import os
 import re
+import sys
+from pathlib import Path
 
-with open("client/src/pages/module-steps.tsx", "r") as f:
-    content = f.read()
-
-# 1. Update StepBlockRenderer
-block_renderer_replacement = r"""function StepBlockRenderer({ block }: { block: any }) { 
-  const width = block.metadata?.width || "full";
-  const basisClass = width === "1/3" ? "md:basis-[calc(33.333%-1.5rem)]" :
-                     width === "1/2" ? "md:basis-[calc(50%-1.5rem)]" : "basis-full";
-
-  if (block.blockType === "split") {
-    const ratio = block.metadata?.splitRatio || "50-50";
-    const reverse = block.metadata?.reverseLayout || false;
-
-    // Calculate grid columns based on ratio
-    let gridCols = "grid-cols-1 md:grid-cols-2"; // Default 50-50
-    if (ratio === "30-70") gridCols = "grid-cols-1 md:grid-cols-[3fr_7fr]";
-    if (ratio === "70-30") gridCols = "grid-cols-1 md:grid-cols-[7fr_3fr]";
-
-    return (
-      <div className={cn("grid gap-8 items-start mb-8", gridCols, basisClass)} data-testid={`content-block-${block.id}`}>
-        <div className={cn("prose prose-lg dark:prose-invert max-w-none", reverse && "md:order-2")}>
-          <div dangerouslySetInnerHTML={{ __html: block.content }} />
-        </div>
-        <div className={cn("rounded-lg overflow-hidden border bg-muted", reverse && "md:order-1")}>
-          {block.imageUrl ? (
-            <img
-              src={block.imageUrl}
-              alt="Step content"
-              style={{ width: block.metadata?.imageWidth || "100%" }}
-              className="h-auto object-cover"
-            />
-          ) : (
-            <div className="flex items-center justify-center p-12 text-muted-foreground bg-muted/50">
-              <span className="text-sm">No image</span>
-            </div>
-          )}
-        </div>
-      </div>
-    );
-  }
-
-  if (block.blockType === "image") {
-    return (
-      <div className={cn("mb-8", basisClass)} data-testid={`content-block-${block.id}`}>
-        {block.imageUrl && (
-          <div className="rounded-lg overflow-hidden border bg-muted">
-            <img
-              src={block.imageUrl}
-              alt="Step content"
-              style={{ width: block.metadata?.imageWidth || "100%" }}
-              className="h-auto max-h-[600px] object-contain mx-auto"
-            />
-          </div>
-        )}
-      </div>
-    );
-  }
-
-  // Default to text (or legacy blocks)
-  const columns = block.metadata?.columns || 1;
-  const fontSize = block.metadata?.fontSize || "normal";
-
-  const columnClass = columns === 3 ? "prose-columns-3" :
-    columns === 2 ? "prose-columns-2" : "";
-
-  const proseClass = fontSize === "small" ? "prose-sm" :
-    fontSize === "large" ? "prose-lg" :
-      fontSize === "xlarge" ? "prose-xl" :
-        "prose-lg"; // default size
-
-  return (
-    <div className={cn("mb-8", basisClass)} data-testid={`content-block-${block.id}`}>
-      {/* Legacy support: if it has image but no specific type, show it top like before */}
-      {(!block.blockType || block.blockType === 'text') && block.imageUrl && (
-        <div className="mb-6 rounded-lg overflow-hidden">
-          <img
-            src={block.imageUrl}
-            alt="Step content"
-            className="w-full h-auto max-h-96 object-cover"
-          />
-        </div>
-      )}
-
-      {block.content && (
-        <div
-          className={cn(
-            "prose dark:prose-invert max-w-none",
-            proseClass,
-            columnClass
-          )}
-          dangerouslySetInnerHTML={{ __html: block.content }}
-        />
-      )}
-    </div>
-  );
-}"""
-
-content = re.sub(r"function StepBlockRenderer.*?\}\n\}", block_renderer_replacement, content, flags=re.DOTALL)
-
-# 2. Update CardContent and mixedItems container
-content = content.replace('<CardContent className="space-y-6">', '<CardContent className="flex flex-wrap gap-x-6 gap-y-8">')
-content = content.replace('<div className="space-y-8">', '<div className="flex flex-wrap gap-x-6 gap-y-8 w-full">')
-
-# 3. Add basis-full to Checkpoint wrapper
-content = content.replace('className={isLegacySectionStart ? "pt-6 border-t" : ""}', 'className={cn("basis-full", isLegacySectionStart ? "pt-6 border-t" : "")}')
-
-with open("client/src/pages/module-steps.tsx", "w") as f:
-    f.write(content)
-print("done")
+PATH = "client/src/pages/module-steps.tsx"
+
+# The new StepBlockRenderer body lives next to the script instead of in a
+# multi-KB string literal, and is only read once the file needs patching.
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "step_block_renderer.tsx.tmpl")
+
+# Left behind by a previous run (the rewritten mixedItems container)
+PATCHED_MARKER = b"flex flex-wrap gap-x-6 gap-y-8 w-full"
+
+# Patterns and templates are bytes: the edits are ASCII, so the file is never
+# decoded or re-encoded.
+#
+# 2. Update CardContent and mixedItems container, 3. add basis-full to the
+# Checkpoint wrapper. These are plain literal swaps, looked up by matched text.
+layout_edits = {
+    b'<CardContent className="space-y-6">': b'<CardContent className="flex flex-wrap gap-x-6 gap-y-8">',
+    b'<div className="space-y-8">': b'<div className="flex flex-wrap gap-x-6 gap-y-8 w-full">',
+    b'className={isLegacySectionStart ? "pt-6 border-t" : ""}': b'className={cn("basis-full", isLegacySectionStart ? "pt-6 border-t" : "")}',
+}
+
+# All edits share one scan of the file. Group 1 is the StepBlockRenderer
+# function (1.), which ends at the first "}" followed by a line holding only
+# "}", with either LF or CRLF line endings. Its loop steps over every other
+# character exactly once and never backtracks, so a missing closing line costs
+# one linear scan: the loop runs inside a lookahead, which re leaves as soon as
+# it matches, and the backreference to group 2 then consumes what it matched.
+# This is the possessive "*+" spelled so that Pythons before 3.11 accept it.
+# The rest are the escaped layout literals.
+REWRITE_RE = re.compile(
+    rb"(function StepBlockRenderer\b(?=((?:[^}]|\}(?!\r?\n\}))*))\2\}\r?\n\})|"
+    + b"|".join(re.escape(old) for old in layout_edits)
+)
+
+_block_renderer_replacement = None
+
+
+def load_template():
+    # 1. Update StepBlockRenderer. Read once per process, however many files
+    # are patched.
+    global _block_renderer_replacement
+    if _block_renderer_replacement is None:
+        _block_renderer_replacement = Path(TEMPLATE_PATH).read_bytes().removesuffix(b"\n")
+    return _block_renderer_replacement
+
+
+# The callable returns the templates verbatim, so re never parses them for
+# backreferences. A CRLF file gets the template with CRLF line endings too;
+# the layout replacements are single lines and need no conversion.
+def rewrite(m):
+    if m.group(1) is not None:
+        if b"\r\n" in m.group(1):
+            return load_template().replace(b"\n", b"\r\n")
+        return load_template()
+    return layout_edits[m.group(0)]
+
+
+def write_all(fd, data):
+    # os.write may return early on a short write, so keep going until every
+    # byte is out.
+    pending = memoryview(data)
+    while pending:
+        pending = pending[os.write(fd, pending):]
+
+
+def copy_range(out_fd, in_fd, source, offset, count):
+    # os.sendfile copies inside the kernel without the bytes ever reaching
+    # Python, retrying on short transfers like write_all. Between two regular
+    # files it only works on Linux (macOS wants a socket as the destination),
+    # so elsewhere, or if the kernel refuses, the rest of the span is written
+    # from the mapping instead.
+    if sys.platform == "linux":
+        try:
+            while count:
+                sent = os.sendfile(out_fd, in_fd, offset, count)
+                if not sent:
+                    break
+                offset += sent
+                count -= sent
+        except OSError:
+            pass
+        else:
+            # sendfile hit end of file early: the source shrank under us, and
+            # the mapping past its new end is no longer readable either.
+            if count:
+                raise OSError(f"source file shrank while copying at offset {offset}")
+    write_all(out_fd, source[offset:offset + count])
+
+
+def patch(path):
+    # Map the file instead of reading it: the edits are located by scanning the
+    # page cache in place. The descriptor and the mapping stay open as the
+    # source of the unchanged spans.
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        st = os.fstat(fd)
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as source:
+            # Rerunning on an already patched file is a no-op; find that out
+            # with one substring search instead of the full rewrite and
+            # write-back.
+            if source.find(PATCHED_MARKER) != -1:
+                print(f"{path}: already patched")
+                return True
+
+            # The file becomes the unchanged (offset, length) spans between the
+            # matches, interleaved with the replacement bytes.
+            pieces = []
+            pos = 0
+            renderers = 0
+            layout_matches = dict.fromkeys(layout_edits, 0)
+            for m in REWRITE_RE.finditer(source):
+                if m.group(1) is not None:
+                    renderers += 1
+                else:
+                    layout_matches[m.group(0)] += 1
+                pieces.append((pos, m.start() - pos))
+                pieces.append(rewrite(m))
+                pos = m.end()
+            pieces.append((pos, st.st_size - pos))
+
+            # Check the rewrite from the match counts, so neither this script
+            # nor its caller has to read the file back: the outcome is on
+            # stdout. StepBlockRenderer must have been replaced exactly once and
+            # every layout literal at least once; a file whose layout no longer
+            # matches the edits is left untouched.
+            if renderers != 1 or not all(layout_matches.values()):
+                print(f"{path}: rewrite incomplete, file left unchanged", file=sys.stderr)
+                return False
+
+            # Build a sibling temp file with no text layer in between: only the
+            # replacements are written from Python, the unchanged spans are
+            # copied by the kernel where it can. Swap it in atomically so an
+            # interrupted run never leaves a truncated file behind, and remove
+            # it again if anything fails before the swap.
+            tmp_path = path + ".tmp"
+            out_fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, st.st_mode & 0o777)
+            try:
+                try:
+                    # The mode given to os.open is masked by the umask; set it
+                    # again so the swapped-in file keeps the original bits.
+                    os.fchmod(out_fd, st.st_mode & 0o777)
+                    for piece in pieces:
+                        if isinstance(piece, bytes):
+                            write_all(out_fd, piece)
+                        else:
+                            copy_range(out_fd, fd, source, *piece)
+                finally:
+                    os.close(out_fd)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+    finally:
+        os.close(fd)
+    print(f"{path}: done, verified")
+    return True
+
+
+if __name__ == "__main__":
+    # Patch every file named on the command line in this one process, so the
+    # interpreter start-up, the REWRITE_RE compile and the template read are
+    # paid once rather than per file.
+    # A path that cannot be patched is reported and counted as a failure, but
+    # does not stop the rest of the batch.
+    results = []
+    for path in sys.argv[1:] or [PATH]:
+        try:
+            results.append(patch(path))
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            results.append(False)
+    sys.exit(0 if all(results) else 1)